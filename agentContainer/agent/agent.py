@@ -1,5 +1,5 @@
 from services.mcp_service import MCPService
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator
 import logging
 import traceback
 from datetime import datetime
@@ -37,9 +37,9 @@ logging.getLogger('langgraph').setLevel(logging.WARNING)
 # Initialize prompt manager and log available prompts
 try:
     available_prompts = prompt_manager.list_available_prompts()
-    logger.info(f"✅ Prompt manager initialized with prompts: {available_prompts}")
+    logger.info("✅ Prompt manager initialized with prompts: %s", available_prompts)
 except Exception as e:
-    logger.error(f"❌ CRITICAL: Failed to initialize prompt manager: {e}")
+    logger.error("❌ CRITICAL: Failed to initialize prompt manager: %s", e)
     logger.warning("⚠️  Agent will attempt to continue but prompts may not load correctly")
 
 async def create_agent_with_mcp(mcp_service: MCPService):
@@ -74,6 +74,63 @@ async def create_agent_with_mcp(mcp_service: MCPService):
     
     return mcp_graph
 
+def create_initial_state(task: str, mcp_service: MCPService) -> AgenticState:
+    """Build the starting graph state for a task"""
+    return AgenticState({
+        "task": task,
+        "mcp_service": mcp_service,
+        "outputs": [],
+        "attempts": 0,
+        "keep_refining": True,
+        "available_tools": [],
+        "notebook_data": None
+    })
+
+async def stream_agent(task: str, mcp_service: MCPService) -> AsyncIterator[Dict[str, Any]]:
+    """Run the agent, yielding model token deltas and a progress event as each graph node completes"""
+    logger.info("🤖 AGENT STREAM STARTING: %s", task[:100])
+    agent_graph = await create_agent_with_mcp(mcp_service)
+    
+    outputs_sent = 0
+    attempts = 0
+    notebook_data = None
+    async for mode, chunk in agent_graph.astream(create_initial_state(task, mcp_service), stream_mode=["messages", "updates"]):
+        if mode == "messages":
+            # Forward model tokens as they are generated, ahead of the node's full update
+            message_chunk, metadata = chunk
+            if isinstance(message_chunk.content, str) and message_chunk.content:
+                yield {
+                    "node": metadata.get("langgraph_node"),
+                    "delta": message_chunk.content
+                }
+            continue
+        
+        for node_name, node_state in chunk.items():
+            node_state = node_state or {}  # Nodes that return nothing produce a None update
+            attempts = node_state.get("attempts", attempts)
+            notebook_data = node_state.get("notebook_data", notebook_data)
+            
+            # Only send outputs produced since the previous event; an update without
+            # outputs leaves the list unchanged, so it must not move the cursor
+            new_outputs = []
+            if "outputs" in node_state:
+                outputs = node_state["outputs"]
+                new_outputs = outputs[outputs_sent:]
+                outputs_sent = len(outputs)
+            
+            yield {
+                "node": node_name,
+                "attempts": attempts,
+                "outputs": new_outputs
+            }
+    
+    yield {
+        "node": "end",
+        "success": attempts > 0,
+        "attempts": attempts,
+        "notebook_data": notebook_data
+    }
+
 async def run_agent(task: str, mcp_service: MCPService) -> Dict[str, Any]:
     """Run the agent with a given task and MCP service"""
     logger.info("="*80)
@@ -81,17 +138,17 @@ async def run_agent(task: str, mcp_service: MCPService) -> Dict[str, Any]:
     logger.info("="*80)
     
     task_preview = task[:100] + "..." if len(task) > 100 else task
-    logger.info(f"📋 Task: {task_preview}")
-    logger.debug(f"📋 Full task: {task}")
+    logger.info("📋 Task: %s", task_preview)
+    logger.debug("📋 Full task: %s", task)
     
     try:
         start_time = datetime.now()
-        logger.debug(f"⏰ Start time: {start_time.strftime('%H:%M:%S.%f')}")
+        logger.debug("⏰ Start time: %s", start_time.strftime('%H:%M:%S.%f'))
         
         # Validate MCP service
         if not mcp_service:
             error_msg = "No MCP service provided"
-            logger.error(f"❌ CRITICAL: {error_msg}")
+            logger.error("❌ CRITICAL: %s", error_msg)
             return {
                 "task": task,
                 "outputs": [f"Agent execution failed: {error_msg}"],
@@ -103,19 +160,11 @@ async def run_agent(task: str, mcp_service: MCPService) -> Dict[str, Any]:
         
         logger.debug("🔌 MCP Service validation passed")
         
-        initial_state = AgenticState({
-            "task": task,
-            "mcp_service": mcp_service,
-            "outputs": [],
-            "attempts": 0,
-            "keep_refining": True,
-            "available_tools": [],
-            "notebook_data": None
-        })
+        initial_state = create_initial_state(task, mcp_service)
         
         logger.debug("📦 Initial state created")
-        logger.debug(f"   📝 Task length: {len(task)}")
-        logger.debug(f"   🔧 Keep refining: {initial_state['keep_refining']}")
+        logger.debug("   📝 Task length: %s", len(task))
+        logger.debug("   🔧 Keep refining: %s", initial_state['keep_refining'])
         
         logger.info("🏗️  Creating agent graph...")
         agent_graph = await create_agent_with_mcp(mcp_service)
@@ -131,7 +180,7 @@ async def run_agent(task: str, mcp_service: MCPService) -> Dict[str, Any]:
         
         logger.info("-" * 50)
         logger.info("🏁 GRAPH EXECUTION COMPLETED")
-        logger.info(f"⏰ Execution time: {execution_time:.2f} seconds")
+        logger.info("⏰ Execution time: %.2f seconds", execution_time)
         
         result = {
             "task": final_state.get("task", ""),
@@ -145,17 +194,17 @@ async def run_agent(task: str, mcp_service: MCPService) -> Dict[str, Any]:
         logger.info("="*80)
         logger.info("📊 AGENT EXECUTION SUMMARY")
         logger.info("="*80)
-        logger.info(f"✅ Success: {result['success']}")
-        logger.info(f"🔄 Attempts: {result['attempts']}")
-        logger.info(f"📝 Outputs: {len(result['outputs'])}")
-        logger.info(f"📚 Notebook data: {'Available' if result['notebook_data'] else 'Missing'}")
-        logger.info(f"⏰ Duration: {execution_time:.2f}s")
+        logger.info("✅ Success: %s", result['success'])
+        logger.info("🔄 Attempts: %s", result['attempts'])
+        logger.info("📝 Outputs: %s", len(result['outputs']))
+        logger.info("📚 Notebook data: %s", 'Available' if result['notebook_data'] else 'Missing')
+        logger.info("⏰ Duration: %.2fs", execution_time)
         
         if result['outputs']:
             logger.debug("📋 Output details:")
             for i, output in enumerate(result['outputs'], 1):
                 output_preview = output[:200] + "..." if len(output) > 200 else output
-                logger.debug(f"   {i}. {output_preview}")
+                logger.debug("   %s. %s", i, output_preview)
         
         return result
         
@@ -165,9 +214,9 @@ async def run_agent(task: str, mcp_service: MCPService) -> Dict[str, Any]:
         logger.error("="*80)
         logger.error("❌ AGENT EXECUTION FAILED")
         logger.error("="*80)
-        logger.error(f"💥 Error: {str(e)}")
-        logger.error(f"⏰ Failed after: {execution_time:.2f}s")
-        logger.error(f"📍 Full traceback:")
+        logger.error("💥 Error: %s", e)
+        logger.error("⏰ Failed after: %.2fs", execution_time)
+        logger.error("📍 Full traceback:")
         logger.error(traceback.format_exc())
         
         # Return error state
@@ -1,33 +1,44 @@
+import re
 import traceback
 import logging
+from langchain_core.messages import HumanMessage, SystemMessage
 from prompts.prompt_manager import prompt_manager
-from ..utils.model_utils import get_model
+from ..utils.model_utils import get_model, get_model_with_tools
 from ..state.agent_state import log_state_transition, log_mcp_operation
 
 logger = logging.getLogger('AGENT')
 
+# Static tail of the code attempt prompt, built once instead of per attempt
+CODE_ATTEMPT_INSTRUCTIONS = """
+
+Use the tools available to accomplish the task following the MCP stateful workflow.
+Be systematic and check if each step runs properly. 
+Remember to save your work using 'saveNotebook' when complete.
+
+Provide specific tool calls and code that should be executed."""
+
+# Legacy text-mode tool names, matched in a single pass over the response
+LEGACY_TOOL_PATTERN = re.compile(r"saveNotebook|createCodeCell")
+
 async def code_attempt(state):
     attempt_num = state['attempts'] + 1
     log_state_transition("ENTRY" if state['attempts'] == 0 else "REFINING", "CODE_ATTEMPT", state)
-    logger.info(f"🔧 CODE ATTEMPT #{attempt_num}")
+    logger.info("🔧 CODE ATTEMPT #%s", attempt_num)
     
     try:
         logger.debug("📝 Loading code attempt prompt...")
         system_prompt = prompt_manager.get_code_attempt_prompt()
+        tools_context = state["mcp_service"].get_tools_context() if state["mcp_service"] else ""
 
-        prompt = f"""{system_prompt}
-
-CURRENT TASK: {state['task']}
+        # Static instructions first and the task last, so the provider can reuse the cached prefix
+        prompt = [
+            SystemMessage(content=f"""{system_prompt}
 
-Available MCP Tools: {', '.join(state.get('available_tools', []))}
-
-Use the tools available to accomplish the task following the MCP stateful workflow.
-Be systematic and check if each step runs properly. 
-Remember to save your work using 'saveNotebook' when complete.
-
-Provide specific tool calls and code that should be executed."""
+Available MCP Tools: {tools_context}""" + CODE_ATTEMPT_INSTRUCTIONS),
+            HumanMessage(content=f"CURRENT TASK: {state['task']}")
+        ]
         
-        logger.debug(f"🤖 Sending prompt to model (length: {len(prompt)})")
+        logger.debug("🤖 Sending prompt to model (length: %s)", len(prompt[0].content) + len(prompt[1].content))
         
         # Get LangChain tools from MCP service for direct tool integration
         mcp_tools = []
@@ -35,7 +46,7 @@ Provide specific tool calls and code that should be executed."""
             logger.debug("🔌 Loading LangChain MCP tools...")
             try:
                 mcp_tools = state["mcp_service"].get_langchain_tools()
-                log_mcp_operation("get_langchain_tools", True, f"Loaded {len(mcp_tools)} tools")
+                log_mcp_operation("get_langchain_tools", True, "Loaded %s tools", len(mcp_tools))
             except Exception as e:
                 log_mcp_operation("get_langchain_tools", False, error=str(e))
         else:
@@ -43,83 +54,86 @@ Provide specific tool calls and code that should be executed."""
         
         # If we have tools, bind them to the model for direct tool calling
         if mcp_tools:
-            logger.debug(f"🔗 Binding {len(mcp_tools)} tools to model...")
-            model_with_tools = get_model().bind_tools(mcp_tools)
+            model_with_tools = get_model_with_tools(mcp_tools)
             response = await model_with_tools.ainvoke(prompt)
         else:
             logger.debug("🤖 Using model without tools (fallback mode)")
             response = await get_model().ainvoke(prompt)
             
         response_text = response.content if hasattr(response, 'content') else str(response)
-        logger.debug(f"✅ Model response received (length: {len(response_text)})")
+        logger.debug("✅ Model response received (length: %s)", len(response_text))
+        
+        # Tool results are collected and joined once, instead of re-copying the text per result
+        output_parts = [response_text]
         
         # Check if model made tool calls
         tool_calls_executed = 0
         if hasattr(response, 'tool_calls') and response.tool_calls:
-            logger.info(f"🔧 Executing {len(response.tool_calls)} tool calls...")
+            logger.info("🔧 Executing %s tool calls...", len(response.tool_calls))
             
             for i, tool_call in enumerate(response.tool_calls, 1):
-                try:
-                    tool_name = tool_call['name']
-                    tool_args = tool_call['args']
-                    logger.info(f"   🛠️  Tool {i}/{len(response.tool_calls)}: {tool_name}")
-                    logger.debug(f"      📋 Args: {tool_args}")
-                    
-                    result = await state["mcp_service"].call_mcp_tool(tool_name, tool_args)
-                    tool_calls_executed += 1
-                    
-                    log_mcp_operation(f"call_mcp_tool({tool_name})", True, f"Result: {str(result)[:100]}...")
-                    response_text += f"\n\n✅ Tool '{tool_name}' executed successfully: {result}"
-                    
-                except Exception as e:
-                    tool_name = tool_call.get('name', 'unknown')
-                    error_msg = f"Error executing tool '{tool_name}': {str(e)}"
-                    logger.error(f"❌ Tool execution failed: {error_msg}")
-                    logger.error(f"   💥 Tool error traceback: {traceback.format_exc()}")
+                logger.info("   🛠️  Tool %s/%s: %s", i, len(response.tool_calls), tool_call.get('name', 'unknown'))
+                logger.debug("      📋 Args: %s", tool_call.get('args'))
+            
+            # Adjacent read-only calls share their round-trips; state-changing calls keep their order
+            calls = [(tool_call.get('name', 'unknown'), tool_call.get('args', {})) for tool_call in response.tool_calls]
+            results = await state["mcp_service"].call_mcp_tools(calls)
+            
+            for (tool_name, _), result in zip(calls, results):
+                if isinstance(result, Exception):
+                    error_msg = f"Error executing tool '{tool_name}': {str(result)}"
+                    logger.error("❌ Tool execution failed: %s", error_msg)
+                    logger.error("   💥 Tool error traceback: %s", ''.join(traceback.format_exception(result)))
                     log_mcp_operation(f"call_mcp_tool({tool_name})", False, error=error_msg)
-                    response_text += f"\n\n❌ {error_msg}"
+                    output_parts.append(f"\n\n❌ {error_msg}")
+                else:
+                    tool_calls_executed += 1
+                    log_mcp_operation(f"call_mcp_tool({tool_name})", True, "Result: %.100s...", result)
+                    output_parts.append(f"\n\n✅ Tool '{tool_name}' executed successfully: {result}")
         
         # Fallback: Try to execute MCP tools based on text parsing (legacy approach)
         elif state["mcp_service"]:
             logger.debug("🔍 Checking for legacy tool patterns in response...")
             try:
                 # Parse potential tool calls from the response
-                if "saveNotebook" in response_text:
+                legacy_tools = set(LEGACY_TOOL_PATTERN.findall(response_text))
+                if "saveNotebook" in legacy_tools:
                     logger.info("📄 Found saveNotebook command in response")
                     filename = "agent_notebook.ipynb"  # default
-                    logger.debug(f"   💾 Saving as: {filename}")
+                    logger.debug("   💾 Saving as: %s", filename)
                     result = await state["mcp_service"].call_mcp_tool("saveNotebook", {"filename": filename})
                     tool_calls_executed += 1
-                    log_mcp_operation("saveNotebook", True, f"Saved: {filename}")
-                    response_text += f"\n\n✅ Notebook saved: {result}"
+                    log_mcp_operation("saveNotebook", True, "Saved: %s", filename)
+                    output_parts.append(f"\n\n✅ Notebook saved: {result}")
                 
-                if "createCodeCell" in response_text:
+                if "createCodeCell" in legacy_tools:
                     logger.info("📝 Found createCodeCell command in response")
                     tool_calls_executed += 1
                     # Add more parsing logic here if needed
                     
             except Exception as e:
                 error_msg = f"Error using MCP tools: {str(e)}"
-                logger.error(f"❌ Legacy tool execution failed: {error_msg}")
-                logger.error(f"   💥 MCP tools error traceback: {traceback.format_exc()}")
+                logger.error("❌ Legacy tool execution failed: %s", error_msg)
+                logger.error("   💥 MCP tools error traceback: %s", traceback.format_exc())
                 log_mcp_operation("legacy_tools", False, error=error_msg)
-                response_text += f"\n\n❌ {error_msg}"
+                output_parts.append(f"\n\n❌ {error_msg}")
         else:
             logger.error("❌ CRITICAL: No MCP service available for tool execution")
         
+        response_text = "".join(output_parts)
         state["outputs"].append(response_text)
         state["attempts"] += 1
         
-        logger.info(f"✅ CODE ATTEMPT #{attempt_num} completed")
-        logger.info(f"   🛠️  Tools executed: {tool_calls_executed}")
-        logger.info(f"   📊 Total attempts: {state['attempts']}")
-        logger.debug(f"   📝 Output length: {len(response_text)}")
+        logger.info("✅ CODE ATTEMPT #%s completed", attempt_num)
+        logger.info("   🛠️  Tools executed: %s", tool_calls_executed)
+        logger.info("   📊 Total attempts: %s", state['attempts'])
+        logger.debug("   📝 Output length: %s", len(response_text))
         
         return state
         
     except Exception as e:
-        logger.error(f"❌ CRITICAL: Code attempt #{attempt_num} failed: {str(e)}")
-        logger.error(f"   💥 Full traceback: {traceback.format_exc()}")
+        logger.error("❌ CRITICAL: Code attempt #%s failed: %s", attempt_num, e)
+        logger.error("   💥 Full traceback: %s", traceback.format_exc())
         error_output = f"Code attempt error: {str(e)}"
         state["outputs"].append(error_output)
         state["attempts"] += 1
@@ -1,21 +1,29 @@
 import traceback
 import logging
+from langchain_core.messages import HumanMessage, SystemMessage
 from prompts.prompt_manager import prompt_manager
 from ..utils.model_utils import get_model
 from ..state.agent_state import log_state_transition, log_mcp_operation
 
 logger = logging.getLogger('AGENT')
 
+# Static tail of the entry prompt, built once instead of per task
+ENTRY_INSTRUCTIONS = """
+
+Provide a refined task description that makes use of the available notebook tools and follows the MCP stateful workflow."""
+
 async def entry(state):
     log_state_transition("START", "ENTRY", state)
     
+    tools_context = ""
     try:
         # Check MCP service availability
         if state["mcp_service"]:
             logger.debug("🔌 MCP Service found in state")
             try:
                 state["available_tools"] = state["mcp_service"].get_available_tools()
-                log_mcp_operation("get_available_tools", True, f"Found {len(state['available_tools'])} tools")
+                tools_context = state["mcp_service"].get_tools_context()
+                log_mcp_operation("get_available_tools", True, "Found %s tools", len(state['available_tools']))
             except Exception as mcp_error:
                 log_mcp_operation("get_available_tools", False, error=str(mcp_error))
                 state["available_tools"] = []
@@ -25,32 +33,32 @@ async def entry(state):
         
         logger.debug("📝 Loading entry prompt...")
         system_prompt = prompt_manager.get_entry_prompt()
-        logger.debug(f"   📄 Prompt loaded (length: {len(system_prompt)})")
+        logger.debug("   📄 Prompt loaded (length: %s)", len(system_prompt))
 
-        prompt = f"""{system_prompt}
+        # Static instructions first and the task last, so the provider can reuse the cached prefix
+        prompt = [
+            SystemMessage(content=f"""{system_prompt}
 
-CURRENT TASK: Please refine the following task: {state['task']}
+Available MCP Tools: {tools_context}""" + ENTRY_INSTRUCTIONS),
+            HumanMessage(content=f"""CURRENT TASK: Please refine the following task: {state['task']}
 
 Previous outputs:
-{chr(10).join(state['outputs'])}
-
-Available MCP Tools: {', '.join(state.get('available_tools', []))}
-
-Provide a refined task description that makes use of the available notebook tools and follows the MCP stateful workflow."""
+{chr(10).join(state['outputs'])}""")
+        ]
         
-        logger.debug(f"🤖 Sending prompt to model (length: {len(prompt)})")
+        logger.debug("🤖 Sending prompt to model (length: %s)", len(prompt[0].content) + len(prompt[1].content))
         response = await get_model().ainvoke(prompt)
         response_content = response.content if hasattr(response, 'content') else str(response)
         
-        logger.info(f"✅ ENTRY phase completed")
-        logger.debug(f"   📊 Response length: {len(response_content)}")
-        logger.debug(f"   📝 Task refined: {response_content[:100]}..." if len(response_content) > 100 else f"   📝 Task refined: {response_content}")
+        logger.info("✅ ENTRY phase completed")
+        logger.debug("   📊 Response length: %s", len(response_content))
+        logger.debug("   📝 Task refined: %s%s", response_content[:100], "..." if len(response_content) > 100 else "")
         
         state["task"] = response_content
         return state
         
     except Exception as e:
-        logger.error(f"❌ CRITICAL: Entry phase failed: {str(e)}")
-        logger.error(f"   💥 Full traceback: {traceback.format_exc()}")
+        logger.error("❌ CRITICAL: Entry phase failed: %s", e)
+        logger.error("   💥 Full traceback: %s", traceback.format_exc())
         state["outputs"].append(f"Entry phase error: {str(e)}")
         return state
@@ -1,5 +1,7 @@
+import re
 import traceback
 import logging
+from langchain_core.messages import HumanMessage, SystemMessage
 from prompts.prompt_manager import prompt_manager
 from ..utils.model_utils import get_model
 from ..state.agent_state import log_state_transition
@@ -8,47 +10,55 @@ logger = logging.getLogger('AGENT')
 
 MAX_ATTEMPTS = 5
 
+# Case-insensitive "yes" anywhere in the reply, without lowercasing a copy of it
+YES_PATTERN = re.compile(r"yes", re.IGNORECASE)
+
+# Static tail of the refining prompt, built once instead of per decision
+REFINING_INSTRUCTIONS = """
+
+Consider the MCP stateful workflow and whether you need to create more content, execute more operations, or if you're ready to save and finalize.
+
+Answer yes or no. ONLY YES OR NO!"""
+
 async def refining(state):
     log_state_transition("CODE_ATTEMPT", "REFINING", state)
     
     try:
         if state["attempts"] >= MAX_ATTEMPTS:
-            logger.warning(f"⏹️  STOPPING: Maximum attempts ({MAX_ATTEMPTS}) reached")
-            logger.debug(f"   📊 Total outputs generated: {len(state.get('outputs', []))}")
+            logger.warning("⏹️  STOPPING: Maximum attempts (%s) reached", MAX_ATTEMPTS)
+            logger.debug("   📊 Total outputs generated: %s", len(state.get('outputs', [])))
             state["keep_refining"] = False
             return state
         else:
             logger.debug("📝 Loading refining prompt...")
             system_prompt = prompt_manager.get_refining_prompt()
 
-            prompt = f"""{system_prompt}
-
-Do you need to keep refining the code to accomplish the task: {state['task']}
-
-Consider the MCP stateful workflow and whether you need to create more content, execute more operations, or if you're ready to save and finalize.
-
-Answer yes or no. ONLY YES OR NO!"""
+            # Static instructions first and the task last, so the provider can reuse the cached prefix
+            prompt = [
+                SystemMessage(content=system_prompt + REFINING_INSTRUCTIONS),
+                HumanMessage(content=f"Do you need to keep refining the code to accomplish the task: {state['task']}")
+            ]
             
-            logger.debug(f"🤖 Asking model about refinement continuation...")
+            logger.debug("🤖 Asking model about refinement continuation...")
             response = await get_model().ainvoke(prompt)
             response_text = response.content if hasattr(response, 'content') else str(response)
             
-            should_continue = "yes" in response_text.lower()
+            should_continue = YES_PATTERN.search(response_text) is not None
             
             if should_continue:
                 state["keep_refining"] = True
-                logger.info(f"✅ REFINING: Continuing (model said: '{response_text.strip()}')")
-                logger.debug(f"   🔄 Will proceed to attempt #{state['attempts'] + 1}")
+                logger.info("✅ REFINING: Continuing (model said: '%s')", response_text.strip())
+                logger.debug("   🔄 Will proceed to attempt #%s", state['attempts'] + 1)
             else:
                 state["keep_refining"] = False
-                logger.info(f"✅ REFINING: Stopping (model said: '{response_text.strip()}')")
-                logger.debug(f"   🏁 Moving to FINISHED state")
+                logger.info("✅ REFINING: Stopping (model said: '%s')", response_text.strip())
+                logger.debug("   🏁 Moving to FINISHED state")
                 
         return state
         
     except Exception as e:
-        logger.error(f"❌ CRITICAL: Refining phase failed: {str(e)}")
-        logger.error(f"   💥 Full traceback: {traceback.format_exc()}")
+        logger.error("❌ CRITICAL: Refining phase failed: %s", e)
+        logger.error("   💥 Full traceback: %s", traceback.format_exc())
         state["keep_refining"] = False
         state["outputs"].append(f"Refining phase error: {str(e)}")
         return state
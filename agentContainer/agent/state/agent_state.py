@@ -16,27 +16,27 @@ class AgenticState(dict):
 
 def log_state_transition(from_state: str, to_state: str, state: AgenticState):
     """Log state transitions with key debugging info"""
-    logger.info(f"🔄 STATE TRANSITION: {from_state} → {to_state}")
-    logger.debug(f"   📊 Attempts: {state.get('attempts', 0)}")
-    logger.debug(f"   🔧 Keep refining: {state.get('keep_refining', False)}")
-    logger.debug(f"   📝 Outputs count: {len(state.get('outputs', []))}")
-    logger.debug(f"   🛠️  Available tools: {len(state.get('available_tools', []))}")
+    logger.info("🔄 STATE TRANSITION: %s → %s", from_state, to_state)
+    logger.debug("   📊 Attempts: %s", state.get('attempts', 0))
+    logger.debug("   🔧 Keep refining: %s", state.get('keep_refining', False))
+    logger.debug("   📝 Outputs count: %s", len(state.get('outputs', [])))
+    logger.debug("   🛠️  Available tools: %s", len(state.get('available_tools', [])))
     
     # Log MCP service status
     if state.get('mcp_service'):
-        logger.debug(f"   🔌 MCP Service: CONNECTED")
+        logger.debug("   🔌 MCP Service: CONNECTED")
     else:
-        logger.warning(f"   🔌 MCP Service: DISCONNECTED ⚠️")
+        logger.warning("   🔌 MCP Service: DISCONNECTED ⚠️")
 
-def log_mcp_operation(operation: str, success: bool, details: str = "", error: str = ""):
-    """Log MCP service operations with detailed info"""
+def log_mcp_operation(operation: str, success: bool, details: str = "", *details_args: Any, error: str = ""):
+    """Log MCP service operations with detailed info; details is a %-style template filled lazily from details_args"""
     if success:
-        logger.info(f"✅ MCP {operation}: SUCCESS")
+        logger.info("✅ MCP %s: SUCCESS", operation)
         if details:
-            logger.debug(f"   📋 Details: {details}")
+            logger.debug("   📋 Details: " + details, *details_args)
     else:
-        logger.error(f"❌ MCP {operation}: FAILED")
+        logger.error("❌ MCP %s: FAILED", operation)
         if error:
-            logger.error(f"   💥 Error: {error}")
+            logger.error("   💥 Error: %s", error)
         if details:
-            logger.debug(f"   📋 Details: {details}")
+            logger.debug("   📋 Details: " + details, *details_args)
@@ -1,6 +1,9 @@
 import os
+import asyncio
 import logging
 import traceback
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 
@@ -8,46 +11,83 @@ load_dotenv()
 
 logger = logging.getLogger('AGENT')
 
-_model = None
+# Tool-bound model per tool-name fingerprint, so bind_tools runs once per tool set
+_bound_models: Dict[Tuple[str, ...], Any] = {}
+
+# Per-call generation overrides for the warm-up request
+WARM_UP_GENERATION_CONFIG = {"max_output_tokens": 1, "temperature": 0}
+
+# Credentials path already confirmed on disk, so the hot path skips the stat call
+_verified_credentials_path: Optional[str] = None
+
+@lru_cache(maxsize=8)
+def get_chat_model(model_name: str, temperature: float, max_tokens: int) -> ChatGoogleGenerativeAI:
+    """Create one shared ChatGoogleGenerativeAI client per configuration"""
+    logger.debug("🤖 Initializing ChatGoogleGenerativeAI model (%s)...", model_name)
+    model = ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
+    logger.info("✅ ChatGoogleGenerativeAI model (%s) initialized successfully", model_name)
+    return model
 
 def get_model():
-    """Get or create the ChatGoogleGenerativeAI model with proper credentials"""
-    global _model
-    if _model is None:
-        logger.debug("🤖 Initializing ChatGoogleGenerativeAI model...")
-        try:
-            # Set up Google ADC credentials
-            credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', './service-account-key.json')
-            
+    """Get the shared ChatGoogleGenerativeAI model with proper credentials"""
+    global _verified_credentials_path
+    try:
+        # Set up Google ADC credentials
+        credentials_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', './service-account-key.json')
+        
+        if credentials_path != _verified_credentials_path:
             if not os.path.exists(credentials_path):
                 error_msg = f"Google service account key file not found at: {credentials_path}"
-                logger.error(f"❌ CRITICAL: {error_msg}")
+                logger.error("❌ CRITICAL: %s", error_msg)
                 print(f"❌ CRITICAL: {error_msg}")
                 raise ValueError(error_msg)
             
             # Set the environment variable for Google ADC
             os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = credentials_path
-            logger.debug(f"🔑 Google ADC credentials set: {credentials_path}")
-            
-            # Get model name from environment or use default
-            model_name = os.getenv('GEMINI_MODEL', 'gemini-2.0')
-            logger.debug(f"🎯 Using model: {model_name}")
-            
-            # Initialize the model
-            _model = ChatGoogleGenerativeAI(
-                model=model_name,
-                temperature=0.7,  # Add some creativity
-                max_tokens=4096   # Higher token limit for Gemini
-            )
-            logger.info(f"✅ ChatGoogleGenerativeAI model ({model_name}) initialized successfully")
-            
-        except Exception as e:
-            error_msg = f"Failed to initialize ChatGoogleGenerativeAI: {e}"
-            logger.error(f"❌ CRITICAL: {error_msg}")
-            logger.error(f"💥 Model initialization traceback: {traceback.format_exc()}")
-            print(f"❌ CRITICAL: {error_msg}")
-            raise e
-    else:
-        logger.debug("🤖 Using cached ChatGoogleGenerativeAI model")
-    
-    return _model
+            _verified_credentials_path = credentials_path
+        
+        # Get model name from environment or use default
+        model_name = os.getenv('GEMINI_MODEL', 'gemini-2.0')
+        
+        return get_chat_model(
+            model_name,
+            0.7,   # Add some creativity
+            4096   # Higher token limit for Gemini
+        )
+        
+    except Exception as e:
+        error_msg = f"Failed to initialize ChatGoogleGenerativeAI: {e}"
+        logger.error("❌ CRITICAL: %s", error_msg)
+        logger.error("💥 Model initialization traceback: %s", traceback.format_exc())
+        print(f"❌ CRITICAL: {error_msg}")
+        raise e
+
+def get_model_with_tools(tools: List[Any]):
+    """Get the model with the given tools bound, reusing the binding for the same tool set"""
+    key = tuple(sorted(tool.name for tool in tools))
+    bound_model = _bound_models.get(key)
+    if bound_model is None:
+        logger.debug("🔗 Binding %s tools to model...", len(tools))
+        bound_model = _bound_models[key] = get_model().bind_tools(tools)
+    return bound_model
+
+async def warm_up_model(tools: Optional[List[Any]] = None) -> bool:
+    """Create the model (and tool binding) and issue a tiny request so the first user task skips setup"""
+    try:
+        # Credential lookup, client construction and tool schema conversion are blocking,
+        # so run them on a worker thread and keep the loop free for incoming requests
+        model = await asyncio.to_thread(get_model)
+        if tools:
+            await asyncio.to_thread(get_model_with_tools, tools)
+        # One deterministic output token is enough to open the connection; the 4096-token
+        # default would make every worker pay for a full generation at startup
+        await model.bind(generation_config=WARM_UP_GENERATION_CONFIG).ainvoke("Respond with only the word OK.")
+        logger.info("🔥 Model connection warmed up")
+        return True
+    except Exception as e:
+        logger.warning("⚠️  Model warm-up failed (will retry lazily on first request): %s", e)
+        return False
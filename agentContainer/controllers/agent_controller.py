@@ -3,12 +3,12 @@ Agent Controller - FastAPI routes for the MCP Agent
 """
 from typing import Dict, Any
 from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import io
 import json
+import orjson
 import logging
 import traceback
-import httpx
 from datetime import datetime
 
 from models.schemas import (
@@ -24,7 +24,7 @@ from models.schemas import (
     NotebookDownloadResponse
 )
 from services.mcp_service import MCPService
-from agent.agent import run_agent
+from agent.agent import run_agent, stream_agent
 
 # Set up logging - INFO level to reduce noise
 logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(name)s - %(message)s')
@@ -37,6 +37,17 @@ router = APIRouter()
 mcp_service: MCPService = None
 
 
+# Health payloads only vary by MCP connectivity, so serialize both once at import
+_HEALTH_BYTES = {
+    connected: json.dumps(HealthResponse(
+        status="healthy",
+        message="MCP Agent is running",
+        mcp_connected=connected
+    ).model_dump()).encode("utf-8")
+    for connected in (True, False)
+}
+
+
 def set_mcp_service(service: MCPService):
     """Set the MCP service instance"""
     global mcp_service
@@ -53,15 +64,10 @@ async def health_check():
         else:
             logger.error("❌ MCP service is None")
         
-        response = HealthResponse(
-            status="healthy",
-            message="MCP Agent is running",
-            mcp_connected=mcp_connected
-        )
-        return response
+        return Response(content=_HEALTH_BYTES[mcp_connected], media_type="application/json")
     except Exception as e:
-        logger.error(f"❌ Health check failed: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("❌ Health check failed: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Health check failed: {str(e)}"
@@ -97,8 +103,8 @@ async def get_status():
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Status check failed: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Status check failed: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Status check failed: {str(e)}"
@@ -124,7 +130,7 @@ async def list_notebooks():
         try:
             mcp_connected = await mcp_service.check_connection_status()
         except Exception as conn_error:
-            logger.error(f"Connection check failed: {conn_error}")
+            logger.error("Connection check failed: %s", conn_error)
             mcp_connected = False
         
         if not mcp_connected:
@@ -141,7 +147,7 @@ async def list_notebooks():
         try:
             result = await mcp_service.list_notebooks()
         except Exception as list_error:
-            logger.error(f"Failed to call list_notebooks: {list_error}")
+            logger.error("Failed to call list_notebooks: %s", list_error)
             # Return empty list with error info
             return {
                 "notebooks": [],
@@ -201,8 +207,8 @@ async def list_notebooks():
         return response
         
     except Exception as e:
-        logger.error(f"Unexpected error in list_notebooks: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Unexpected error in list_notebooks: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         # Return error response instead of raising HTTP exception
         return {
             "notebooks": [],
@@ -216,7 +222,7 @@ async def list_notebooks():
 @router.post("/notebooks")
 async def save_notebook(request: NotebookRequest):
     """Save a notebook"""
-    if not mcp_service or not mcp_service.is_connected():
+    if not mcp_service or not await mcp_service.ensure_connected():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MCP service not connected"
@@ -235,7 +241,7 @@ async def save_notebook(request: NotebookRequest):
 @router.get("/notebooks/{name}")
 async def load_notebook(name: str):
     """Load a specific notebook"""
-    if not mcp_service or not mcp_service.is_connected():
+    if not mcp_service or not await mcp_service.ensure_connected():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MCP service not connected"
@@ -254,7 +260,7 @@ async def load_notebook(name: str):
 @router.delete("/notebooks/{name}")
 async def delete_notebook(name: str):
     """Delete a specific notebook"""
-    if not mcp_service or not mcp_service.is_connected():
+    if not mcp_service or not await mcp_service.ensure_connected():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MCP service not connected"
@@ -273,8 +279,8 @@ async def delete_notebook(name: str):
 @router.post("/agent/run", response_model=AgentTaskResponse)
 async def run_agent_task(request: AgentTaskRequest):
     """Run an agent task with MCP tools"""
-    logger.info(f"Agent task requested: {request.task[:100]}..." if len(request.task) > 100 else f"Agent task requested: {request.task}")
-    logger.debug(f"Full request: {request}")
+    logger.info("Agent task requested: %s%s", request.task[:100], "..." if len(request.task) > 100 else "")
+    logger.debug("Full request: %s", request)
     
     try:
         if not mcp_service:
@@ -302,19 +308,19 @@ async def run_agent_task(request: AgentTaskRequest):
         result = await run_agent(request.task, mcp_service)
         
         execution_time = (datetime.now() - start_time).total_seconds()
-        logger.info(f"✅ Agent execution completed in {execution_time:.2f} seconds")
+        logger.info("✅ Agent execution completed in %.2f seconds", execution_time)
         
         # Optionally save notebook if requested
         if request.save_notebook:
             filename = request.notebook_filename or f"agent_task_{hash(request.task) % 10000}.ipynb"
-            logger.info(f"💾 Saving notebook as: {filename}")
+            logger.info("💾 Saving notebook as: %s", filename)
             try:
                 save_result = await mcp_service.call_mcp_tool("saveNotebook", {"filename": filename})
                 result["notebook_saved"] = save_result
-                logger.info(f"✅ Notebook saved successfully")
+                logger.info("✅ Notebook saved successfully")
             except Exception as save_error:
-                logger.error(f"❌ Failed to save notebook: {str(save_error)}")
-                logger.error(f"Save error traceback: {traceback.format_exc()}")
+                logger.error("❌ Failed to save notebook: %s", save_error)
+                logger.error("Save error traceback: %s", traceback.format_exc())
                 result["notebook_save_error"] = str(save_error)
         
         # Ensure outputs are properly formatted as strings
@@ -340,14 +346,14 @@ async def run_agent_task(request: AgentTaskRequest):
             attempts=result["attempts"],
             notebook_data=result.get("notebook_data")
         )
-        logger.info(f"Agent task completed successfully with {result['attempts']} attempts")
+        logger.info("Agent task completed successfully with %s attempts", result['attempts'])
         return response
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Agent task failed: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Agent task failed: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         return AgentTaskResponse(
             success=False,
             task=request.task,
@@ -357,59 +363,98 @@ async def run_agent_task(request: AgentTaskRequest):
         )
 
 
+# One JSON document per line; state updates may carry non-string keys
+NDJSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+
+@router.post("/agent/run/stream")
+async def stream_agent_task(request: AgentTaskRequest):
+    """Run an agent task, streaming progress as newline-delimited JSON events"""
+    logger.info("Streaming agent task requested: %s", request.task[:100])
+    
+    if not mcp_service or not await mcp_service.check_connection_status():
+        logger.error("MCP service not connected (real-time check failed)")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="MCP service not connected"
+        )
+    
+    async def event_stream():
+        try:
+            async for event in stream_agent(request.task, mcp_service):
+                yield orjson.dumps(event, default=str, option=NDJSON_OPTIONS)
+            
+            # Optionally save notebook if requested
+            if request.save_notebook:
+                filename = request.notebook_filename or f"agent_task_{hash(request.task) % 10000}.ipynb"
+                logger.info("💾 Saving notebook as: %s", filename)
+                save_result = await mcp_service.call_mcp_tool("saveNotebook", {"filename": filename})
+                yield orjson.dumps({"node": "saved", "notebook_saved": save_result}, default=str, option=NDJSON_OPTIONS)
+        except Exception as e:
+            logger.error("Streaming agent task failed: %s", e)
+            logger.error("Traceback: %s", traceback.format_exc())
+            yield orjson.dumps({"node": "error", "error": str(e)}, option=NDJSON_OPTIONS)
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+
 @router.get("/agent/download/{filename}")
 async def download_notebook(filename: str):
     """Download a notebook file"""
-    logger.info(f"Download notebook requested: {filename}")
+    logger.info("Download notebook requested: %s", filename)
     
     try:
         # Ensure filename has .ipynb extension
         if not filename.endswith('.ipynb'):
             filename += '.ipynb'
         
-        logger.debug(f"Fetching notebook file from FastAPI server: {filename}")
+        logger.debug("Fetching notebook file from FastAPI server: %s", filename)
         
-        # Use the new FastAPI endpoint (port 8003) for file download
-        fastapi_download_url = f"http://mcp-server:8003/notebooks/{filename}"
+        if not mcp_service:
+            logger.error("MCP service is None")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="MCP service not initialized"
+            )
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(fastapi_download_url)
-            
-            if response.status_code == 404:
-                logger.warning(f"Notebook file not found: {filename}")
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Notebook not found: {filename}"
-                )
-            elif response.status_code != 200:
-                logger.error(f"FastAPI server returned error: {response.status_code}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to fetch notebook from server"
-                )
-            
-            # Get the notebook content
-            notebook_content = response.content
-            
-            logger.info(f"Successfully fetched notebook: {filename} ({len(notebook_content)} bytes)")
-            
-            # Create streaming response for download with proper headers
-            return StreamingResponse(
-                io.BytesIO(notebook_content),
-                media_type="application/x-ipynb+json",
-                headers={
-                    "Content-Disposition": f"attachment; filename={filename}",
-                    "Content-Type": "application/x-ipynb+json",
-                    "Content-Length": str(len(notebook_content)),
-                    "Cache-Control": "no-cache"
-                }
+        # Fetch from the MCP file server (port 8003) over the service's pooled connection
+        response = await mcp_service.fetch_notebook_file(filename)
+        
+        if response.status_code == 404:
+            logger.warning("Notebook file not found: %s", filename)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Notebook not found: {filename}"
             )
+        elif response.status_code != 200:
+            logger.error("FastAPI server returned error: %s", response.status_code)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to fetch notebook from server"
+            )
+        
+        # Get the notebook content
+        notebook_content = response.content
+        
+        logger.info("Successfully fetched notebook: %s (%s bytes)", filename, len(notebook_content))
+        
+        # Create streaming response for download with proper headers
+        return StreamingResponse(
+            io.BytesIO(notebook_content),
+            media_type="application/x-ipynb+json",
+            headers={
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Content-Type": "application/x-ipynb+json",
+                "Content-Length": str(len(notebook_content)),
+                "Cache-Control": "no-cache"
+            }
+        )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to download notebook {filename}: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Failed to download notebook %s: %s", filename, e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to download notebook: {str(e)}"
@@ -419,7 +464,7 @@ async def download_notebook(filename: str):
 @router.get("/agent/notebook/{filename}", response_model=NotebookDownloadResponse)
 async def get_notebook_info(filename: str):
     """Get notebook information and download URL"""
-    if not mcp_service or not mcp_service.is_connected():
+    if not mcp_service or not await mcp_service.ensure_connected():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MCP service not connected"
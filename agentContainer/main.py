@@ -4,13 +4,20 @@ Main FastAPI application for MCP Agent
 import os
 import sys
 import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
+from typing import Optional
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import json
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 import uvicorn
 from dotenv import load_dotenv
 
 from services.mcp_service import MCPService
+from agent.utils.model_utils import get_model_with_tools, warm_up_model
 from controllers.agent_controller import router as agent_router, set_mcp_service
 
 # Load environment variables
@@ -21,10 +28,45 @@ logging.getLogger("mcp.client").setLevel(logging.WARNING)  # Reduce MCP client l
 logging.getLogger("httpx").setLevel(logging.WARNING)       # Reduce HTTP client logs
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)  # Reduce access logs
 
+
+def install_queue_logging() -> Optional[logging.handlers.QueueListener]:
+    """Move the root handlers behind a queue so request handlers never block on log I/O"""
+    root_logger = logging.getLogger()
+    handlers = root_logger.handlers[:]
+    if any(isinstance(handler, logging.handlers.QueueHandler) for handler in handlers):
+        return None  # Already installed (uvicorn re-imports this module as "main")
+    
+    for handler in handlers:
+        root_logger.removeHandler(handler)
+    
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+log_listener = install_queue_logging()
+
 # Global service instance
 mcp_service = MCPService()
 
 
+async def warm_up_services():
+    """Open the MCP connection and warm the LLM client concurrently, then bind the tools"""
+    # The model warm-up doesn't depend on the MCP handshake, so overlap the two round trips
+    connected, _ = await asyncio.gather(mcp_service.connect(), warm_up_model())
+    if not connected:
+        print("⚠️  MCP server not reachable yet, will connect on first request")
+        return
+    
+    try:
+        await asyncio.to_thread(get_model_with_tools, mcp_service.get_langchain_tools())
+    except Exception as e:
+        print(f"⚠️  Tool binding warm-up failed (will bind on first request): {e}")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -37,6 +79,10 @@ async def lifespan(app: FastAPI):
         print("❌ CRITICAL ERROR: Failed to initialize MCP service")
         sys.exit(1)
     
+    # Connect to MCP and warm the model in the background, so boot doesn't wait on
+    # the MCP server; requests arriving earlier connect lazily on first use
+    warm_up_task = asyncio.create_task(warm_up_services())
+    
     # Inject service into controllers
     set_mcp_service(mcp_service)
     
@@ -46,6 +92,8 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("🛑 Shutting down MCP Agent...")
+    warm_up_task.cancel()
+    await mcp_service.aclose()
 
 
 # Create FastAPI app
@@ -53,21 +101,26 @@ app = FastAPI(
     title="MCP Agent API",
     description="FastAPI server for MCP (Model Context Protocol) Agent interactions",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # Agent results carry whole notebooks; encode with orjson
 )
 
 # Include routers
 app.include_router(agent_router, prefix="/api/v1", tags=["agent"])
 
 
+# Static root payload, serialized once at import
+_ROOT_BYTES = json.dumps({
+    "message": "MCP Agent FastAPI Server", 
+    "version": "1.0.0",
+    "docs": "/docs"
+}).encode("utf-8")
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "message": "MCP Agent FastAPI Server", 
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 if __name__ == "__main__":
@@ -76,12 +129,17 @@ if __name__ == "__main__":
     # Get configuration from environment
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", "8001"))
+    workers = int(os.getenv("UVICORN_WORKERS", "1"))
     
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
         reload=False,
+        workers=workers,
+        loop="uvloop",        # Installed with uvicorn[standard]
+        http="httptools",
         log_level="warning",  # Reduce from "info" to "warning"
-        access_log=False      # Disable access logs completely
+        access_log=False,     # Disable access logs completely
+        proxy_headers=False   # Client address/scheme are not used, skip X-Forwarded-* rewriting
     )
\ No newline at end of file
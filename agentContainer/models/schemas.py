@@ -2,7 +2,7 @@
 Pydantic models for the MCP Agent API
 """
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class HealthResponse(BaseModel):
@@ -15,7 +15,7 @@ class HealthResponse(BaseModel):
 class MCPToolRequest(BaseModel):
     """Request model for calling MCP tools"""
     tool_name: str
-    arguments: Dict[str, Any] = {}
+    arguments: Dict[str, Any] = Field(default_factory=dict)
 
 
 class MCPToolResponse(BaseModel):
@@ -29,8 +29,8 @@ class PromptManager:
         self.prompt_cache: Dict[str, str] = {}
         self.version = "1.0.0"  # Prompt version for tracking
         
-        logger.info(f"PromptManager initialized with directory: {self.prompts_dir}")
-        logger.info(f"Prompt version: {self.version}")
+        logger.info("PromptManager initialized with directory: %s", self.prompts_dir)
+        logger.info("Prompt version: %s", self.version)
     
     def load_prompt(self, prompt_name: str) -> str:
         """
@@ -47,7 +47,6 @@ class PromptManager:
         """
         # Check cache first
         if prompt_name in self.prompt_cache:
-            logger.debug(f"Loading prompt '{prompt_name}' from cache")
             return self.prompt_cache[prompt_name]
         
         # Load from file
@@ -64,8 +63,7 @@ class PromptManager:
             
             # Cache the prompt
             self.prompt_cache[prompt_name] = prompt_content
-            logger.info(f"Loaded prompt '{prompt_name}' from {prompt_file}")
-            logger.debug(f"Prompt content length: {len(prompt_content)} characters")
+            logger.info("Loaded prompt '%s' from %s", prompt_name, prompt_file)
             
             return prompt_content
             
@@ -98,12 +96,12 @@ class PromptManager:
     def list_available_prompts(self) -> list:
         """List all available prompt files"""
         if not self.prompts_dir.exists():
-            logger.warning(f"Prompts directory does not exist: {self.prompts_dir}")
+            logger.warning("Prompts directory does not exist: %s", self.prompts_dir)
             return []
         
         prompt_files = list(self.prompts_dir.glob("*.txt"))
         prompt_names = [f.stem for f in prompt_files]
-        logger.info(f"Available prompts: {prompt_names}")
+        logger.info("Available prompts: %s", prompt_names)
         return prompt_names
 
 # Global instance for easy access
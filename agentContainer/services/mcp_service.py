@@ -2,40 +2,199 @@
 MCP Service - Handles all MCP server interactions
 """
 import os
+import orjson
+import logging
+import time
+import fcntl
+import random
 import asyncio
-from typing import Dict, Any, List, Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
+import hashlib
+import tempfile
+import contextlib
+import httpx
+from typing import Dict, Any, List, Optional, Tuple
+from mcp import ClientSession
+from mcp.types import Tool as MCPTool
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentMCPSession:
+    """
+    Keeps one MCP client session open for the lifetime of the process.
+    
+    The session context is entered and exited inside a dedicated background task,
+    because the transport's cancel scopes must be closed by the task that opened them.
+    """
+    
+    def __init__(self, mcp_client: MultiServerMCPClient, server_name: str):
+        self.mcp_client = mcp_client
+        self.server_name = server_name
+        self.session: Optional[ClientSession] = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+    
+    async def start(self) -> ClientSession:
+        """Open the session in the background and wait until it is usable"""
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self.session is None:
+            raise ConnectionError(f"Failed to open MCP session: {self._error}")
+        return self.session
+    
+    async def _run(self):
+        try:
+            async with self.mcp_client.session(self.server_name) as session:
+                self.session = session
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+    
+    def is_alive(self) -> bool:
+        """Whether the session is still open"""
+        return self.session is not None and self._task is not None and not self._task.done()
+    
+    async def ping(self, timeout: float) -> bool:
+        """Round-trip an MCP ping over the open session"""
+        session = self.session
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+    
+    async def aclose(self):
+        """Close the session and wait for the background task to finish"""
+        self._stop.set()
+        if self._task is not None:
+            await self._task
+
+
+# Process-wide (client, session, tools) per MCP server URL, shared by every MCPService instance
+_CLIENT_CACHE: Dict[str, Tuple[MultiServerMCPClient, PersistentMCPSession, List[Any]]] = {}
+_CLIENT_CACHE_LOCK = asyncio.Lock()
+
+# Connection retry backoff (seconds): exponential from base, capped, with jitter
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_CAP = 30.0
+RECONNECT_COOLDOWN = 10.0
+
+# Connection status probes are cached this long (seconds) and time out after PROBE_TIMEOUT
+HEALTH_CHECK_TTL = 5.0
+HEALTH_PROBE_TIMEOUT = 2.0
+
+# Tools that never change notebook state, so adjacent calls may run concurrently
+READ_ONLY_TOOLS = frozenset({"getHistoryInfo", "getCellContent", "getExecutionContext", "listSavedNotebooks"})
+
+# Idle keep-alive lifetime (seconds) for pooled connections to the MCP file server
+FILE_SERVER_KEEPALIVE_EXPIRY = 60.0
+
+
+def _freeze(value: Any) -> Any:
+    """Convert JSON-like arguments into a hashable value usable directly as a dict key"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+async def invalidate_cache(url: str) -> None:
+    """Drop the cached client and tools for a server URL so the next connect rebuilds them"""
+    async with _CLIENT_CACHE_LOCK:
+        cached = _CLIENT_CACHE.pop(url, None)
+    if cached is not None:
+        await cached[1].aclose()
 
 
 class MCPService:
     """Service for managing MCP server connections and operations"""
     
     def __init__(self):
-        self.llm: Optional[ChatGoogleGenerativeAI] = None
         self.mcp_client: Optional[MultiServerMCPClient] = None
+        self.mcp_session: Optional[PersistentMCPSession] = None
         self.mcp_tools: List[Any] = []
         self.available_tools: List[str] = []
+        self._tools_context = ""
+        self._tool_by_name: Dict[str, Any] = {}
         self._initialized = False
         self._connected = False
         
         # Environment variables
-        self.gemini_model = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
         self.mcp_server_url = os.getenv("MCP_SERVER_URL", "http://localhost:8002")
+        self.tools_cache_ttl = float(os.getenv("MCP_TOOLS_CACHE_TTL", "60"))
+        self.file_server_url = os.getenv("MCP_FILE_SERVER_URL", "http://mcp-server:8003")
+        self.max_retries = int(os.getenv("MCP_RETRY_ATTEMPTS", "3"))
+        
+        # Serializes connects; the monotonic time of the last failure rate-limits lazy reconnects
+        self._connect_lock = asyncio.Lock()
+        self._last_connect_failure: Optional[float] = None
+        
+        # Last connection status probe result and when it was taken
+        self._last_health_ts = 0.0
+        self._last_health_ok = False
+        
+        # In-flight READ_ONLY_TOOLS calls by call key, for request coalescing
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        
+        # Pooled keep-alive client for the MCP container's HTTP file server
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._has_credentials = False
         
     async def initialize(self) -> bool:
-        """Initialize the MCP service"""
-        try:
-            print("🔌 Connecting to MCP server...")
-            await self._connect_to_mcp_server()
-            
-            self._initialized = True
-            print("✅ MCP Service initialized successfully")
-            return True
-            
-        except Exception as e:
-            print(f"❌ CRITICAL ERROR: Failed to initialize MCP service: {e}")
+        """Initialize the MCP service (the MCP connection itself is opened lazily)"""
+        if not self.mcp_server_url:
+            logger.error("❌ CRITICAL ERROR: MCP_SERVER_URL environment variable is required")
             return False
+        
+        # Stat the credentials file off the event loop; /status then reads the cached flag
+        self._has_credentials = await asyncio.to_thread(self._check_credentials)
+        
+        self._initialized = True
+        logger.info("✅ MCP Service initialized successfully")
+        return True
+    
+    async def connect(self) -> bool:
+        """Connect to the MCP server, retrying with backoff (used for background warm-up)"""
+        logger.info("🔌 Connecting to MCP server...")
+        async with self._connect_lock:
+            for attempt in range(self.max_retries):
+                if self._connected:
+                    break
+                
+                # Only build the client and open a session once the server accepts connections
+                if await self._probe_server():
+                    await self._connect_to_mcp_server()
+                else:
+                    logger.debug("🔍 MCP server at %s not accepting connections yet", self.mcp_server_url)
+                    self._last_connect_failure = time.monotonic()
+                if self._connected or attempt == self.max_retries - 1:
+                    break
+                
+                # Exponential backoff with jitter so restarting workers don't retry in lockstep
+                delay = min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * (2 ** attempt)) * (0.5 + random.random())
+                logger.info("🔁 Retrying MCP connection in %.1fs (attempt %d/%d)", delay, attempt + 2, self.max_retries)
+                await asyncio.sleep(delay)
+        return self._connected
+    
+    async def ensure_connected(self) -> bool:
+        """Connect on first use; after a failure, retry at most once per cooldown"""
+        if self._connected:
+            return True
+        async with self._connect_lock:
+            if not self._connected and self._reconnect_due():
+                await self._connect_to_mcp_server()
+        return self._connected
     
     async def _connect_to_mcp_server(self):
         """Connect to the MCP server using LangChain MCP adapters with streamable_http transport"""
@@ -54,54 +213,208 @@ class MCPService:
         }
         
         try:
-            # Create MCP client using LangChain adapters for streamable HTTP
-            self.mcp_client = MultiServerMCPClient(server_config)
+            async with _CLIENT_CACHE_LOCK:
+                cached = _CLIENT_CACHE.get(full_url)
+                if cached is None:
+                    # Create MCP client using LangChain adapters for streamable HTTP
+                    mcp_client = MultiServerMCPClient(server_config)
+                    
+                    # Open one long-lived session that every tool call reuses
+                    mcp_session = PersistentMCPSession(mcp_client, "notebook_server")
+                    session = await mcp_session.start()
+                    try:
+                        mcp_tools = await self._discover_tools(session)
+                    except Exception:
+                        await mcp_session.aclose()
+                        raise
+                    cached = _CLIENT_CACHE[full_url] = (mcp_client, mcp_session, mcp_tools)
+                else:
+                    logger.debug("📦 Reusing MCP client and tools from process cache")
             
-            # Get tools directly from the client
-            self.mcp_tools = await self.mcp_client.get_tools()
+            self.mcp_client, self.mcp_session, self.mcp_tools = cached
             
-            # Extract tool names
+            # Extract tool names and index the tool objects for O(1) dispatch
             self.available_tools = [tool.name for tool in self.mcp_tools]
+            self._tool_by_name = {tool.name: tool for tool in self.mcp_tools}
+            self._tools_context = ", ".join(self.available_tools)
             
             self._connected = True
-            print(f"✅ Connected to MCP server. Available tools: {len(self.available_tools)}")
+            self._last_connect_failure = None
+            logger.info("✅ Connected to MCP server. Available tools: %d", len(self.available_tools))
             
         except Exception as e:
-            print(f"❌ CRITICAL ERROR: Failed to connect to MCP server: {e}")
-            print(f"🔧 Attempted connection to: {full_url}")
-            print(f"🔧 Make sure MCP server is running on {self.mcp_server_url}")
+            logger.error("❌ CRITICAL ERROR: Failed to connect to MCP server: %s", e)
+            logger.debug("🔧 Attempted connection to: %s", full_url)
+            logger.debug("🔧 Make sure MCP server is running on %s", self.mcp_server_url)
             self._connected = False
+            self._last_connect_failure = time.monotonic()
             self.available_tools = []
+            self._tool_by_name = {}
+            self._tools_context = ""
+    
+    async def _discover_tools(self, session: ClientSession) -> List[Any]:
+        """Build LangChain tools from the server's tool schemas (or the shared schema file)"""
+        # Reuse the tool schemas another worker fetched recently, if any
+        tool_schemas = self._load_cached_tool_schemas()
+        if tool_schemas is None:
+            tool_schemas = (await session.list_tools()).tools
+            self._store_tool_schemas(tool_schemas)
+        else:
+            logger.debug("📦 Loaded %d MCP tool schemas from cache", len(tool_schemas))
+        
+        # Wrap the schemas as LangChain tools bound to the persistent session
+        return [convert_mcp_tool_to_langchain_tool(session, tool) for tool in tool_schemas]
+    
+    def _tools_cache_path(self) -> str:
+        """Path of the tool schema cache shared by all workers for this server URL"""
+        url_hash = hashlib.sha1(self.mcp_server_url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(tempfile.gettempdir(), f"mcp_tools_cache_{url_hash}.json")
+    
+    def _load_cached_tool_schemas(self) -> Optional[List[MCPTool]]:
+        """Load tool schemas from the cache file if it is younger than the TTL"""
+        cache_path = self._tools_cache_path()
+        try:
+            if time.time() - os.path.getmtime(cache_path) > self.tools_cache_ttl:
+                return None
+            with open(cache_path, 'rb') as f:
+                return [MCPTool.model_validate(tool) for tool in orjson.loads(f.read())]
+        except (OSError, ValueError):
+            return None
+    
+    def _store_tool_schemas(self, tool_schemas: List[MCPTool]) -> None:
+        """Atomically write tool schemas to the cache file (only one worker writes)"""
+        cache_path = self._tools_cache_path()
+        try:
+            with open(f"{cache_path}.lock", 'w') as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return  # Another worker is already writing the cache
+                
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(orjson.dumps([tool.model_dump(mode="json", exclude_none=True) for tool in tool_schemas]))
+                os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning("⚠️  Failed to write MCP tool schema cache: %s", e)
     
     async def call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call an MCP tool using the MCP client"""
+        if tool_name not in READ_ONLY_TOOLS:
+            return await self._call_mcp_tool(tool_name, arguments)
+        
+        # Identical read-only calls already in flight share a single round-trip
+        call_key = (tool_name, _freeze(arguments))
+        inflight = self._inflight.get(call_key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[call_key] = future
+        try:
+            result = await self._call_mcp_tool(tool_name, arguments)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; hand followers an ordinary error so callers
+            # that collect exceptions (call_mcp_tools) report the call as failed
+            future.set_exception(ConnectionError(f"Shared '{tool_name}' call was cancelled before completing"))
+            future.exception()  # Mark retrieved; waiters (if any) still receive it
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; waiters (if any) still receive it
+            raise
+        finally:
+            del self._inflight[call_key]
+    
+    async def _call_mcp_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Call an MCP tool through its LangChain adapter, dropping the connection on transport errors"""
+        if not self._connected:
+            await self.ensure_connected()
+        
         if not self._connected or not self.mcp_client:
             raise ValueError("MCP client not connected")
             
-        if tool_name not in self.available_tools:
+        # Membership check and lookup both go through the name index, not the tool list
+        tool_obj = self._tool_by_name.get(tool_name)
+        if tool_obj is None:
             raise ValueError(f"Tool '{tool_name}' not available. Available tools: {self.available_tools}")
         
         try:
-            # Find the tool object by name
-            tool_obj = None
-            for tool in self.mcp_tools:
-                if tool.name == tool_name:
-                    tool_obj = tool
-                    break
-            
-            if tool_obj is None:
-                raise ValueError(f"Tool object for '{tool_name}' not found")
-            
             # Call the tool using its run method
             result = await tool_obj.arun(arguments)
             
-            print(f"✅ MCP tool call '{tool_name}' succeeded")
+            logger.debug("✅ MCP tool call '%s' succeeded", tool_name)
             return result
             
         except Exception as e:
-            print(f"❌ MCP tool call '{tool_name}' failed: {e}")
+            logger.error("❌ MCP tool call '%s' failed: %s", tool_name, e)
+            session_dropped = self.mcp_session is not None and not self.mcp_session.is_alive()
+            if session_dropped or isinstance(e, (ConnectionError, httpx.TransportError)):
+                # The connection is gone; reconnect on the next call
+                self._connected = False
+                await invalidate_cache(f"{self.mcp_server_url}/noteBooks/")
             raise
     
+    async def call_mcp_tools(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Call several MCP tools, overlapping the round-trips of adjacent read-only calls.
+        
+        State-changing calls run one at a time in their original order, so the
+        notebook sees the same sequence of mutations as with sequential calls.
+        A failed call yields its exception in place of a result.
+        """
+        results: List[Any] = []
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+        
+        async def flush_batch():
+            if batch:
+                results.extend(await asyncio.gather(
+                    *(self.call_mcp_tool(tool_name, arguments) for tool_name, arguments in batch),
+                    return_exceptions=True
+                ))
+                batch.clear()
+        
+        for tool_name, arguments in calls:
+            if tool_name in READ_ONLY_TOOLS:
+                batch.append((tool_name, arguments))
+                continue
+            
+            await flush_batch()
+            try:
+                results.append(await self.call_mcp_tool(tool_name, arguments))
+            except Exception as e:
+                results.append(e)
+        
+        await flush_batch()
+        return results
+    
+    def get_http_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP client for the MCP file server, creating it on first use"""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                base_url=self.file_server_url,
+                timeout=30,
+                # Downloads are sporadic, so keep idle connections longer than httpx's 5 s default
+                limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=FILE_SERVER_KEEPALIVE_EXPIRY)
+            )
+        return self._http_client
+    
+    async def fetch_notebook_file(self, filename: str) -> httpx.Response:
+        """Fetch a saved notebook file from the MCP file server"""
+        return await self.get_http_client().get(f"/notebooks/{filename}")
+    
+    async def aclose(self):
+        """Close the persistent MCP session and pooled connections held by the service"""
+        await invalidate_cache(f"{self.mcp_server_url}/noteBooks/")
+        self.mcp_session = None
+        self._connected = False
+        
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
     async def list_notebooks(self) -> Any:
         """List all saved notebooks"""
         return await self.call_mcp_tool("listSavedNotebooks", {})
@@ -120,6 +433,13 @@ class MCPService:
         """Delete a notebook"""
         return await self.call_mcp_tool("deleteNotebook", {"filename": filename})
     
+    def _reconnect_due(self) -> bool:
+        """Whether the cooldown since the last failed connect has passed"""
+        return (
+            self._last_connect_failure is None
+            or time.monotonic() - self._last_connect_failure >= RECONNECT_COOLDOWN
+        )
+    
     def is_initialized(self) -> bool:
         """Check if service is initialized"""
         return self._initialized
@@ -129,29 +449,59 @@ class MCPService:
         return self._connected
     
     async def check_connection_status(self) -> bool:
-        """Actively check if MCP server is reachable right now"""
-        if not self.mcp_client:
-            return False
-            
-        try:
-            # Try to get tools list as a connection test
-            tools = await self.mcp_client.get_tools()
-            self._connected = True
-            return True
-        except Exception as e:
-            print(f"🔍 Connection check failed: {e}")
+        """Actively check if MCP server is reachable right now (cached for HEALTH_CHECK_TTL)"""
+        if time.monotonic() - self._last_health_ts < HEALTH_CHECK_TTL:
+            return self._last_health_ok
+        
+        if self._connected and self.mcp_session is not None and not self.mcp_session.is_alive():
             self._connected = False
+            await invalidate_cache(f"{self.mcp_server_url}/noteBooks/")
+        
+        if not self._connected:
+            connected = await self.ensure_connected()
+        elif await self.mcp_session.ping(HEALTH_PROBE_TIMEOUT):
+            connected = True
+        else:
+            logger.debug("🔍 Connection check failed: MCP server unreachable")
+            self._connected = False
+            await invalidate_cache(f"{self.mcp_server_url}/noteBooks/")
+            connected = False
+        
+        self._last_health_ts = time.monotonic()
+        self._last_health_ok = connected
+        return connected
+    
+    async def _probe_server(self) -> bool:
+        """Cheap reachability check: open and close a TCP connection to the MCP server"""
+        url = httpx.URL(self.mcp_server_url)
+        port = url.port or (443 if url.scheme == "https" else 80)
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(url.host, port), HEALTH_PROBE_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
             return False
+        
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+        return True
     
     def get_available_tools(self) -> List[str]:
         """Get list of available MCP tools"""
         return self.available_tools.copy()
     
+    def get_tools_context(self) -> str:
+        """Get the comma-separated tool names for prompts (built once per connect)"""
+        return self._tools_context
+    
     def get_langchain_tools(self) -> List[Any]:
         """Get the actual LangChain tool objects for agent integration"""
         return self.mcp_tools.copy()
     
     def has_credentials(self) -> bool:
         """Check if Google credentials are available"""
+        return self._has_credentials
+    
+    def _check_credentials(self) -> bool:
+        """Look for the Google credentials file on disk"""
         google_creds = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
         return google_creds is not None and os.path.exists(google_creds)
\ No newline at end of file
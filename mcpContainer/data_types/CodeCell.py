@@ -1,9 +1,9 @@
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, ClassVar, Dict, List, Optional
 
-@dataclass
+@dataclass(slots=True)
 class CodeCell:
-    cell_type: str = field(init=False, default="code")
+    cell_type: ClassVar[str] = "code"  # Shared by every instance, not stored per cell
     execution_count: Optional[int] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
     source: str = ""
@@ -1,10 +1,10 @@
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, ClassVar, Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class MarkdownCell:
-    cell_type: str = field(init=False, default="markdown")
+    cell_type: ClassVar[str] = "markdown"  # Shared by every instance, not stored per cell
     metadata: Dict[str, Any] = field(default_factory=dict)
     source: str = ""
     attachments: Optional[Dict[str, Dict[str, Any]]] = None
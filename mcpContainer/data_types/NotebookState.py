@@ -1,14 +1,20 @@
-from typing import List, Dict, Any, Union
+import functools
+from collections import deque
+from typing import Callable, Deque, Dict, Any, Hashable, Union
 from .CodeCell import CodeCell
 from .Mardown import MarkdownCell
 
+# Memoized reads kept per version before the cache is emptied
+READ_CACHE_MAX_SIZE = 256
+
 
 class NotebookState:
     """
     Singleton class to manage the global state of the notebook including:
-    - history: List of all cells in the notebook
+    - history: Deque of all cells in the notebook (O(1) inserts/deletes at either end)
     - execution_context: Dictionary containing variables from code execution
     - global_execution_count: Counter for cell executions
+    - version: Counter bumped after every state-changing tool, keying memoized reads
     """
     _instance = None
     _initialized = False
@@ -20,19 +26,52 @@ class NotebookState:
 
     def __init__(self):
         if not NotebookState._initialized:
-            self.history: List[Union[CodeCell, MarkdownCell]] = []
+            self.history: Deque[Union[CodeCell, MarkdownCell]] = deque()
             self.execution_context: Dict[str, Any] = {}
             self.global_execution_count: int = 1
+            self.version: int = 0
+            self._read_cache: Dict[Hashable, Any] = {}
+            self._read_cache_version: int = 0
             NotebookState._initialized = True
 
+    def mutates(self, func: Callable) -> Callable:
+        """Decorator for tools that change notebook state; bumps version when the tool returns"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                # Bump after the change (even a partial one), so no read can cache the old state under the new version
+                self.version += 1
+        return wrapper
+
+    def cached_read(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Return the memoized result of a read for the current version, building it on a miss"""
+        version = self.version
+        if self._read_cache_version != version or len(self._read_cache) >= READ_CACHE_MAX_SIZE:
+            self._read_cache.clear()
+            self._read_cache_version = version
+        
+        if key in self._read_cache:
+            return self._read_cache[key]
+        
+        result = build()
+        # A tool that finished while this read was building has already made the result stale
+        if self.version == version == self._read_cache_version:
+            self._read_cache[key] = result
+        return result
+
     def reset_execution_context(self):
         """Reset the execution context and global execution count"""
         self.execution_context.clear()
         self.global_execution_count = 1
         # Clear outputs from all cells and reset execution counts
         for cell in self.history:
-            if cell.cell_type == "code":
-                cell.outputs = []
+            if type(cell) is CodeCell:  # Identity check instead of a string compare on cell_type
+                if cell.outputs is None:
+                    cell.outputs = []
+                else:
+                    cell.outputs.clear()  # Truncate in place rather than allocating a fresh list per cell
                 cell.execution_count = None
 
     def clear_history(self):
@@ -49,9 +88,10 @@ class NotebookState:
 
     def get_user_variables(self) -> Dict[str, str]:
         """Get user-defined variables from execution context (excluding built-ins)"""
+        # '__builtins__' is itself a dunder name, so the prefix check alone covers it
         return {
             k: str(v) for k, v in self.execution_context.items() 
-            if not k.startswith('__') and k not in ['__builtins__']
+            if k[:2] != '__'
         }
 
     @classmethod
@@ -1,17 +1,19 @@
 from fastmcp import FastMCP
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
-import requests
-import json
-import pickle
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 import os
-import time
+import sys
+import traceback
+import orjson
 import asyncio
 import uvicorn
-from datetime import datetime, timedelta
-from data_types import CodeCell, MarkdownCell, NotebookState
-from utils import run_cell, debug_tool
-from typing import Dict, Union, List, Any
+try:
+    import uvloop
+except ImportError:  # uvloop has no Windows or PyPy builds; fall back to the default asyncio loop
+    uvloop = None
+from datetime import datetime
+from data_types import NotebookState
 from tools import register_notebook_tools, register_cell_tools, register_execution_tools
 
 mcp = FastMCP("KnowledgeMCP")
@@ -23,31 +25,74 @@ register_notebook_tools(mcp, notebook_state)
 register_cell_tools(mcp, notebook_state)
 register_execution_tools(mcp, notebook_state)
 
+class JSONGZipMiddleware:
+    """GZip the JSON endpoints only; notebook downloads stay on FileResponse's direct file path"""
+    
+    def __init__(self, app, **gzip_options):
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, **gzip_options)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in GZIP_PATHS:
+            await self.gzip_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+# Paths whose JSON bodies are worth compressing
+GZIP_PATHS = frozenset({"/notebooks/list/all"})
+
 # Create separate FastAPI app for HTTP endpoints
-fastapi_app = FastAPI(title="Notebook File Server", description="HTTP endpoints for notebook file operations")
+fastapi_app = FastAPI(
+    title="Notebook File Server",
+    description="HTTP endpoints for notebook file operations",
+    default_response_class=ORJSONResponse
+)
+# Large listings compress well; the size floor keeps small ones uncompressed
+fastapi_app.add_middleware(JSONGZipMiddleware, minimum_size=2048, compresslevel=5)
+
+# Directory the notebook tools save into; created once here instead of on every request
+NOTEBOOKS_DIR = '/app/notebooks'
+os.makedirs(NOTEBOOKS_DIR, exist_ok=True)
+
+# Serialized listing of the notebooks directory, rebuilt only when the directory's mtime changes
+_listing_cache = {"mtime": None, "body": b""}
+
+
+def _list_notebook_names():
+    """Names of the .ipynb files in NOTEBOOKS_DIR, read straight from the directory entries"""
+    with os.scandir(NOTEBOOKS_DIR) as entries:
+        return [entry.name for entry in entries if entry.name.endswith('.ipynb')]
+
 
 # Add regular FastAPI endpoints for direct file serving
 @fastapi_app.get("/notebooks/{filename}")
 async def download_notebook_file(filename: str):
     """Direct file download endpoint for notebook files"""
     try:
+        # Reject anything but a single file name inside NOTEBOOKS_DIR before touching the disk
+        if os.path.basename(filename) != filename or filename in ('.', '..'):
+            raise HTTPException(status_code=400, detail=f"Invalid notebook filename: {filename}")
+        
         # Ensure filename has .ipynb extension
         if not filename.endswith('.ipynb'):
             filename += '.ipynb'
         
-        # Construct file path
-        notebooks_dir = '/app/notebooks'
-        filepath = os.path.join(notebooks_dir, filename)
+        # Construct file path (filename is a single path component, so no join needed)
+        filepath = f"{NOTEBOOKS_DIR}/{filename}"
         
-        # Check if file exists
-        if not os.path.exists(filepath):
+        # Check if file exists (off the event loop, so disk latency doesn't stall MCP traffic)
+        try:
+            stat_result = await asyncio.to_thread(os.stat, filepath)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail=f"Notebook file not found: {filename}")
         
-        # Return the file directly
+        # Return the file directly; handing over the stat result saves FileResponse a second stat
         return FileResponse(
             path=filepath,
             media_type="application/x-ipynb+json",
-            filename=filename
+            filename=filename,
+            stat_result=stat_result
         )
         
     except HTTPException:
@@ -56,28 +101,30 @@ async def download_notebook_file(filename: str):
         raise HTTPException(status_code=500, detail=f"Failed to serve notebook file: {str(e)}")
 
 
-@fastapi_app.get("/notebooks/list/all")
+@fastapi_app.get("/notebooks/list/all", response_model=None)
 async def list_notebook_files():
     """List all notebook files in the notebooks directory"""
     try:
-        notebooks_dir = '/app/notebooks'
+        # Adding, removing or renaming a file bumps the directory mtime, so an unchanged
+        # mtime means the cached listing is still current
+        mtime = (await asyncio.to_thread(os.stat, NOTEBOOKS_DIR)).st_mtime_ns
+        if mtime != _listing_cache["mtime"]:
+            # List all .ipynb files (in a worker thread, the event loop is shared with the MCP server)
+            notebooks = await asyncio.to_thread(_list_notebook_names)
+            notebooks.sort()  # Sort alphabetically
+            
+            _listing_cache["body"] = orjson.dumps({
+                "success": True,
+                "notebooks": notebooks,
+                "count": len(notebooks),
+                "message": f"Found {len(notebooks)} saved notebooks"
+            })
+            _listing_cache["mtime"] = mtime
         
-        # Create directory if it doesn't exist
-        os.makedirs(notebooks_dir, exist_ok=True)
-        
-        # List all .ipynb files
-        notebooks = [f for f in os.listdir(notebooks_dir) if f.endswith('.ipynb')]
-        notebooks.sort()  # Sort alphabetically
-        
-        return JSONResponse({
-            "success": True,
-            "notebooks": notebooks,
-            "count": len(notebooks),
-            "message": f"Found {len(notebooks)} saved notebooks"
-        })
+        return Response(content=_listing_cache["body"], media_type="application/json")
         
     except Exception as e:
-        return JSONResponse({
+        return ORJSONResponse({
             "success": False,
             "notebooks": [],
             "count": 0,
@@ -85,14 +132,16 @@ async def list_notebook_files():
         }, status_code=500)
 
 
-@fastapi_app.get("/health")
+# Static part of the health payload, serialized once at import; only the timestamp varies
+_HEALTH_PREFIX = b'{"status":"healthy","service":"notebook-file-server","timestamp":"'
+_HEALTH_SUFFIX = b'"}'
+
+
+@fastapi_app.get("/health", response_model=None)
 async def health_check():
     """Health check endpoint for FastAPI server"""
-    return JSONResponse({
-        "status": "healthy",
-        "service": "notebook-file-server",
-        "timestamp": datetime.now().isoformat()
-    })
+    timestamp = datetime.now().isoformat().encode()
+    return Response(content=_HEALTH_PREFIX + timestamp + _HEALTH_SUFFIX, media_type="application/json")
 
 
 async def run_mcp_server():
@@ -108,7 +157,9 @@ async def run_fastapi_server():
         fastapi_app, 
         host="0.0.0.0", 
         port=8003,
-        log_level="info"
+        log_level="info",
+        http="httptools",
+        proxy_headers=False  # Client address/scheme are not used, skip X-Forwarded-* rewriting
     )
     server = uvicorn.Server(config)
     await server.serve()
@@ -120,18 +171,27 @@ async def main():
     print("MCP Server: http://localhost:8002/noteBooks/")
     print("FastAPI Server: http://localhost:8003")
     
+    failed = False
     try:
-        # Run both servers concurrently
-        await asyncio.gather(
-            run_mcp_server(),
-            run_fastapi_server(),
-            return_exceptions=True
-        )
-    except Exception as e:
-        print(f"Error running servers: {e}")
-    except KeyboardInterrupt:
-        print("Shutting down servers...")
+        # Run both servers concurrently; if either one crashes, the TaskGroup cancels
+        # the other and re-raises instead of leaving a half-working process behind
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(run_mcp_server())
+            tg.create_task(run_fastapi_server())
+    except* Exception as eg:
+        failed = True
+        for error in eg.exceptions:
+            print(f"Error running servers: {error}")
+            traceback.print_exception(error)
+    
+    if failed:
+        # Exit non-zero so the container restarts instead of reporting a clean stop
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        # Both servers share this loop, so running it on uvloop covers MCP and file traffic alike
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop if uvloop else None)
+    except KeyboardInterrupt:
+        print("Shutting down servers...")
\ No newline at end of file
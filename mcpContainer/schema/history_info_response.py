@@ -5,6 +5,7 @@ This module defines the response schema for the getHistoryInfo tool.
 """
 
 from typing import TypedDict, List
+from typing_extensions import NotRequired
 
 
 class HistoryInfoResponse(TypedDict):
@@ -18,10 +19,13 @@ class HistoryInfoResponse(TypedDict):
         markdown_cells: Integer count of markdown cells
         executed_cells: Integer count of executed code cells
         global_execution_count: Integer representing the current global execution count
+        previews: List of the first preview_chars characters of each cell's source
+                  (only present when previews were requested)
     """
     total_cells: int
     cell_types: List[str]
     code_cells: int
     markdown_cells: int
     executed_cells: int
-    global_execution_count: int
\ No newline at end of file
+    global_execution_count: int
+    previews: NotRequired[List[str]]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from fastmcp import FastMCP
-from utils import debug_tool
+from utils import debug_tool, invalid_index_message, invalid_insert_index_message
 from typing import Dict, Union
 from data_types import CodeCell, MarkdownCell, NotebookState
 from schema import (
@@ -12,10 +12,23 @@ from schema import (
     ClearHistoryResponse
 )
 
+# Validation failures share one response shape; each call returns a copy
+EMPTY_CONTENT_CREATION_RESPONSE: CellCreationResponse = {
+    "created": False,
+    "index": -1,
+    "message": "Content cannot be empty"
+}
+EMPTY_CONTENT_UPDATE_RESPONSE: CellUpdateResponse = {
+    "updated": False,
+    "message": "Content cannot be empty",
+    "cell_type": ""
+}
+
 def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
     
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def createMarkdownCell(content: str) -> CellCreationResponse:
         """
         Create a markdown cell with the given content and add it to the end of history.
@@ -30,15 +43,12 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
             - message: str (status message)
         """
         try:
-            if not content or not content.strip():
-                return {
-                    "created": False,
-                    "index": -1,
-                    "message": "Content cannot be empty"
-                }
+            source = content.strip() if content else ""
+            if not source:
+                return EMPTY_CONTENT_CREATION_RESPONSE.copy()
             
             # Create the markdown cell
-            markdown_cell = MarkdownCell(source=content.strip())
+            markdown_cell = MarkdownCell(source=source)
             
             # Add to history
             notebook_state.history.append(markdown_cell)
@@ -61,6 +71,7 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def createCodeCell(content: str) -> CellCreationResponse:
         """
         Create a code cell with the given content and add it to the end of history.
@@ -75,16 +86,13 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
             - message: str (status message)
         """
         try:
-            if not content or not content.strip():
-                return {
-                    "created": False,
-                    "index": -1,
-                    "message": "Content cannot be empty"
-                }
+            source = content.strip() if content else ""
+            if not source:
+                return EMPTY_CONTENT_CREATION_RESPONSE.copy()
             
             # Create the code cell
             code_cell = CodeCell(
-                source=content.strip(),
+                source=source,
                 execution_count= None
             )
             
@@ -108,10 +116,14 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
-    def getHistoryInfo() -> HistoryInfoResponse:
+    def getHistoryInfo(preview_chars: int = 0) -> HistoryInfoResponse:
         """
         Get information about the current notebook history.
         
+        Args:
+            preview_chars: If positive, also return the first preview_chars characters
+                           of every cell's source (cheaper than getCellContent per cell)
+            
         Returns:
             Dictionary with:
             - total_cells: int (total number of cells)
@@ -120,21 +132,35 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
             - markdown_cells: int (number of markdown cells)
             - executed_cells: int (number of executed code cells)
             - global_execution_count: int (current global execution count)
+            - previews: list (source previews, only when preview_chars > 0)
         """
         
-        cell_types = [cell.cell_type for cell in notebook_state.history]
-        code_cells = sum(1 for cell in notebook_state.history if cell.cell_type == "code")
-        markdown_cells = sum(1 for cell in notebook_state.history if cell.cell_type == "markdown")
-        executed_cells = sum(1 for cell in notebook_state.history if cell.cell_type == "code" and getattr(cell, 'execution_count', None) is not None)
+        def build_response() -> HistoryInfoResponse:
+            history = notebook_state.history
+            
+            # One attribute pass over the cells; the type counts then run in C over the list
+            cell_types = [cell.cell_type for cell in history]
+            code_cells = cell_types.count("code")
+            markdown_cells = cell_types.count("markdown")
+            executed_cells = sum(1 for cell in history if cell.cell_type == "code" and cell.execution_count is not None)
+            
+            result = {
+                "total_cells": len(cell_types),
+                "cell_types": cell_types,
+                "code_cells": code_cells,
+                "markdown_cells": markdown_cells,
+                "executed_cells": executed_cells,
+                "global_execution_count": notebook_state.global_execution_count
+            }
+            
+            # Slice on the server so long sources are never serialized
+            if preview_chars > 0:
+                result["previews"] = [cell.source[:preview_chars] for cell in history]
+            
+            return result
         
-        return {
-            "total_cells": len(notebook_state.history),
-            "cell_types": cell_types,
-            "code_cells": code_cells,
-            "markdown_cells": markdown_cells,
-            "executed_cells": executed_cells,
-            "global_execution_count": notebook_state.global_execution_count
-        }
+        # Unchanged until the next state-changing tool bumps the notebook version
+        return notebook_state.cached_read(("getHistoryInfo", preview_chars), build_response)
 
     @mcp.tool()
     @debug_tool
@@ -153,32 +179,42 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
             - execution_count: int (execution count for code cells)
             - outputs: List (outputs for code cells)
         """
-        try:
-            if index < 0 or index >= len(notebook_state.history):
+        def build_response() -> CellContentResponse:
+            history = notebook_state.history
+            total = len(history)
+            
+            if index < 0 or index >= total:
                 return {
                     "found": False,
-                    "content": f"Invalid index. History contains {len(notebook_state.history)} cells (0-{len(notebook_state.history)-1})",
+                    "content": invalid_index_message(total),
                     "cell_type": "",
                     "execution_count": None,
                     "outputs": []
                 }
             
-            cell = notebook_state.history[index]
-            result = {
-                "found": True,
-                "content": cell.source,
-                "cell_type": cell.cell_type
-            }
+            cell = history[index]
             
-            # Add execution info for code cells
+            # Build the response in one literal; only code cells carry execution info
             if cell.cell_type == "code":
-                result["execution_count"] = getattr(cell, 'execution_count', None)
-                result["outputs"] = getattr(cell, 'outputs', [])
-            else:
-                result["execution_count"] = None
-                result["outputs"] = []
+                return {
+                    "found": True,
+                    "content": cell.source,
+                    "cell_type": "code",
+                    "execution_count": cell.execution_count,
+                    "outputs": cell.outputs
+                }
             
-            return result
+            return {
+                "found": True,
+                "content": cell.source,
+                "cell_type": cell.cell_type,
+                "execution_count": None,
+                "outputs": []
+            }
+        
+        try:
+            # Memoized per index until the next state-changing tool bumps the notebook version
+            return notebook_state.cached_read(("getCellContent", index), build_response)
             
         except Exception as e:
             return {
@@ -191,6 +227,7 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def insertMarkdownCell(content: str, index: int) -> CellCreationResponse:
         """
         Insert a markdown cell at the specified index, shifting existing cells to the right.
@@ -206,25 +243,25 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
             - message: str (status message)
         """
         try:
-            if not content or not content.strip():
-                return {
-                    "created": False,
-                    "index": -1,
-                    "message": "Content cannot be empty"
-                }
+            history = notebook_state.history
+            total = len(history)
+            
+            source = content.strip() if content else ""
+            if not source:
+                return EMPTY_CONTENT_CREATION_RESPONSE.copy()
             
-            if index < 0 or index > len(notebook_state.history):
+            if index < 0 or index > total:
                 return {
                     "created": False,
                     "index": -1,
-                    "message": f"Invalid index. Must be between 0 and {len(notebook_state.history)} (inclusive)"
+                    "message": invalid_insert_index_message(total)
                 }
             
             # Create the markdown cell
-            markdown_cell = MarkdownCell(source=content.strip())
+            markdown_cell = MarkdownCell(source=source)
             
             # Insert at specified position
-            notebook_state.history.insert(index, markdown_cell)
+            history.insert(index, markdown_cell)
             
             return {
                 "created": True,
@@ -241,6 +278,7 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def insertCodeCell(content: str, index: int) -> CellCreationResponse:
         """
         Insert a code cell at the specified index, shifting existing cells to the right.
@@ -256,28 +294,28 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
             - message: str (status message)
         """
         try:
-            if not content or not content.strip():
-                return {
-                    "created": False,
-                    "index": -1,
-                    "message": "Content cannot be empty"
-                }
+            history = notebook_state.history
+            total = len(history)
             
-            if index < 0 or index > len(notebook_state.history):
+            source = content.strip() if content else ""
+            if not source:
+                return EMPTY_CONTENT_CREATION_RESPONSE.copy()
+            
+            if index < 0 or index > total:
                 return {
                     "created": False,
                     "index": -1,
-                    "message": f"Invalid index. Must be between 0 and {len(notebook_state.history)} (inclusive)"
+                    "message": invalid_insert_index_message(total)
                 }
             
             # Create the code cell
             code_cell = CodeCell(
-                source=content.strip(),
+                source=source,
                 execution_count=None
             )
             
             # Insert at specified position
-            notebook_state.history.insert(index, code_cell)
+            history.insert(index, code_cell)
             
             return {
                 "created": True,
@@ -294,6 +332,7 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def updateCell(index: int, content: str) -> CellUpdateResponse:
         """
         Update the content of an existing cell at the specified index.
@@ -309,23 +348,23 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
             - cell_type: str (type of the updated cell)
         """
         try:
-            if index < 0 or index >= len(notebook_state.history):
-                return {
-                    "updated": False,
-                    "message": f"Invalid index. History contains {len(notebook_state.history)} cells (0-{len(notebook_state.history)-1})",
-                    "cell_type": ""
-                }
+            history = notebook_state.history
+            total = len(history)
             
-            if not content or not content.strip():
+            if index < 0 or index >= total:
                 return {
                     "updated": False,
-                    "message": "Content cannot be empty",
+                    "message": invalid_index_message(total),
                     "cell_type": ""
                 }
             
+            source = content.strip() if content else ""
+            if not source:
+                return EMPTY_CONTENT_UPDATE_RESPONSE.copy()
+            
             # Update the cell content
-            cell = notebook_state.history[index]
-            cell.source = content.strip()
+            cell = history[index]
+            cell.source = source
             
             return {
                 "updated": True,
@@ -342,6 +381,7 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def deleteCell(index: int) -> CellDeleteResponse:
         """
         Delete a cell at the specified index, shifting remaining cells to the left.
@@ -357,25 +397,28 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
             - deleted_cell_type: str (type of the deleted cell)
         """
         try:
-            if index < 0 or index >= len(notebook_state.history):
+            history = notebook_state.history
+            total = len(history)
+            
+            if index < 0 or index >= total:
                 return {
                     "deleted": False,
-                    "message": f"Invalid index. History contains {len(notebook_state.history)} cells (0-{len(notebook_state.history)-1})",
-                    "new_total": len(notebook_state.history),
+                    "message": invalid_index_message(total),
+                    "new_total": total,
                     "deleted_cell_type": ""
                 }
             
             # Get cell type before deletion for confirmation
-            deleted_cell = notebook_state.history[index]
+            deleted_cell = history[index]
             deleted_cell_type = deleted_cell.cell_type
             
             # Remove the cell
-            notebook_state.history.pop(index)
+            del history[index]
             
             return {
                 "deleted": True,
                 "message": f"{deleted_cell_type.capitalize()} cell at index {index} deleted successfully",
-                "new_total": len(notebook_state.history),
+                "new_total": total - 1,
                 "deleted_cell_type": deleted_cell_type
             }
             
@@ -389,6 +432,7 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def moveCell(from_index: int, to_index: int) -> CellMoveResponse:
         """
         Move a cell from one position to another.
@@ -404,17 +448,20 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
             - cell_type: str (type of the moved cell)
         """
         try:
-            if from_index < 0 or from_index >= len(notebook_state.history):
+            history = notebook_state.history
+            total = len(history)
+            
+            if from_index < 0 or from_index >= total:
                 return {
                     "moved": False,
-                    "message": f"Invalid from_index. History contains {len(notebook_state.history)} cells (0-{len(notebook_state.history)-1})",
+                    "message": invalid_index_message(total, "from_index"),
                     "cell_type": ""
                 }
             
-            if to_index < 0 or to_index >= len(notebook_state.history):
+            if to_index < 0 or to_index >= total:
                 return {
                     "moved": False,
-                    "message": f"Invalid to_index. History contains {len(notebook_state.history)} cells (0-{len(notebook_state.history)-1})",
+                    "message": invalid_index_message(total, "to_index"),
                     "cell_type": ""
                 }
             
@@ -422,12 +469,13 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
                 return {
                     "moved": True,
                     "message": "Cell is already at the target position",
-                    "cell_type": notebook_state.history[from_index].cell_type
+                    "cell_type": history[from_index].cell_type
                 }
             
-            # Move the cell
-            cell = notebook_state.history.pop(from_index)
-            notebook_state.history.insert(to_index, cell)
+            # Move the cell (deque.pop takes no index, so remove it with del)
+            cell = history[from_index]
+            del history[from_index]
+            history.insert(to_index, cell)
             
             return {
                 "moved": True,
@@ -444,6 +492,7 @@ def register_cell_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def clearHistory() -> ClearHistoryResponse:
         """
         Clear all cells from the history and optionally reset the execution context.
@@ -1,5 +1,5 @@
 from fastmcp import FastMCP
-from utils import debug_tool, run_cell
+from utils import debug_tool, run_cell, invalid_index_message
 from typing import Dict, Union, List
 from data_types import NotebookState
 from schema import (
@@ -12,6 +12,7 @@ from schema import (
 def register_execution_tools(mcp: FastMCP, notebook_state: NotebookState):
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def executeCodeCell(index: int) -> ExecuteCodeCellResponse:
         """
         Execute a code cell at the specified index and update its execution count.
@@ -30,14 +31,17 @@ def register_execution_tools(mcp: FastMCP, notebook_state: NotebookState):
         """
         
         try:
-            if index < 0 or index >= len(notebook_state.history):
+            total = len(notebook_state.history)
+            
+            if index < 0 or index >= total:
+                error_msg = invalid_index_message(total)
                 return {
                     "executed": False,
                     "stdout": "",
                     "result": None,
-                    "error": f"Invalid index. History contains {len(notebook_state.history)} cells (0-{len(notebook_state.history)-1})",
+                    "error": error_msg,
                     "execution_count": -1,
-                    "message": f"Invalid index. History contains {len(notebook_state.history)} cells (0-{len(notebook_state.history)-1})"
+                    "message": error_msg
                 }
             
             cell = notebook_state.history[index]
@@ -112,6 +116,7 @@ def register_execution_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def executeAllCells() -> ExecuteAllCellsResponse:
         """
         Execute all code cells in the notebook in order.
@@ -206,6 +211,7 @@ def register_execution_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def restartKernel() -> RestartKernelResponse:
         """
         Restart the kernel by clearing the execution context and resetting execution count.
@@ -245,7 +251,7 @@ def register_execution_tools(mcp: FastMCP, notebook_state: NotebookState):
             - message: str (status message)
         """
         
-        try:
+        def build_response() -> ExecutionContextResponse:
             # Use the notebook state method to get user variables
             user_variables = notebook_state.get_user_variables()
             
@@ -255,6 +261,11 @@ def register_execution_tools(mcp: FastMCP, notebook_state: NotebookState):
                 "variable_count": len(user_variables),
                 "message": f"Retrieved {len(user_variables)} user-defined variables"
             }
+        
+        try:
+            # Variables only change through the execution tools, which bump the state version,
+            # so repeated reads in between skip stringifying every value
+            return notebook_state.cached_read(("getExecutionContext",), build_response)
             
         except Exception as e:
             return {
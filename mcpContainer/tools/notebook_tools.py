@@ -4,6 +4,7 @@ from typing import Dict, Union, List
 from utils import serialize_execution_context
 import os
 import json
+import orjson
 from datetime import datetime
 from data_types import CodeCell, MarkdownCell, NotebookState
 from schema import (
@@ -13,6 +14,29 @@ from schema import (
     LoadNotebookResponse
 )
 
+def _load_markdown_cell(source: str, cell_data: Dict) -> MarkdownCell:
+    cell = MarkdownCell(source=source)
+    cell.metadata = cell_data.get("metadata", {})
+    return cell
+
+def _load_code_cell(source: str, cell_data: Dict) -> CodeCell:
+    cell = CodeCell(
+        source=source,
+        execution_count=cell_data.get("execution_count")
+    )
+    cell.metadata = cell_data.get("metadata", {})
+    cell.outputs = cell_data.get("outputs") or []  # "outputs": null in a file still gives a list
+    return cell
+
+# Last listSavedNotebooks response, reused while the directory's mtime is unchanged
+_listing_cache = {"mtime": None, "response": None}
+
+# Cell builders by notebook cell_type, so loading does one lookup per cell
+CELL_LOADERS = {
+    "markdown": _load_markdown_cell,
+    "code": _load_code_cell
+}
+
 def register_notebook_tools(mcp: FastMCP, notebook_state: NotebookState):
     @mcp.tool()
     @debug_tool
@@ -56,19 +80,23 @@ def register_notebook_tools(mcp: FastMCP, notebook_state: NotebookState):
             for cell in notebook_state.history:
                 cell_data = {
                     "cell_type": cell.cell_type,
-                    "metadata": getattr(cell, 'metadata', {}),
+                    "metadata": cell.metadata,
                     "source": cell.source.split('\n') if cell.source else [""]
                 }
                 
                 if cell.cell_type == "code":
                     cell_data["execution_count"] = cell.execution_count
-                    cell_data["outputs"] = getattr(cell, 'outputs', [])
+                    cell_data["outputs"] = cell.outputs
                 
                 notebook_data["cells"].append(cell_data)
             
             # Test JSON serialization first before creating any files
             try:
-                json_string = json.dumps(notebook_data, indent=2, ensure_ascii=False)
+                try:
+                    json_bytes = orjson.dumps(notebook_data, option=orjson.OPT_INDENT_2)
+                except orjson.JSONEncodeError:
+                    # orjson rejects non-str dict keys and ints wider than 64 bits in outputs; stdlib json handles both
+                    json_bytes = json.dumps(notebook_data, indent=2, ensure_ascii=False).encode('utf-8')
             except (TypeError, ValueError) as json_error:
                 return {
                     "saved": False,
@@ -86,8 +114,8 @@ def register_notebook_tools(mcp: FastMCP, notebook_state: NotebookState):
             
             # Save to file (only after successful JSON serialization)
             filepath = os.path.join(notebooks_dir, filename)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(json_string)
+            with open(filepath, 'wb') as f:
+                f.write(json_bytes)
             
             return {
                 "saved": True,
@@ -121,16 +149,25 @@ def register_notebook_tools(mcp: FastMCP, notebook_state: NotebookState):
             # Create directory if it doesn't exist
             os.makedirs(notebooks_dir, exist_ok=True)
             
+            # Saving a new notebook, deleting one or renaming bumps the directory mtime, whichever
+            # client or container did it, so an unchanged mtime means the listing is still current
+            mtime = os.stat(notebooks_dir).st_mtime_ns
+            if mtime == _listing_cache["mtime"]:
+                return _listing_cache["response"]
+            
             # List all .ipynb files
             notebooks = [f for f in os.listdir(notebooks_dir) if f.endswith('.ipynb')]
             notebooks.sort()  # Sort alphabetically
             
-            return {
+            response = {
                 "success": True,
                 "notebooks": notebooks,
                 "count": len(notebooks),
                 "message": f"Found {len(notebooks)} saved notebooks"
             }
+            _listing_cache["mtime"] = mtime
+            _listing_cache["response"] = response
+            return response
             
         except Exception as e:
             return {
@@ -185,6 +222,7 @@ def register_notebook_tools(mcp: FastMCP, notebook_state: NotebookState):
 
     @mcp.tool()
     @debug_tool
+    @notebook_state.mutates
     def loadNotebook(filepath: str) -> LoadNotebookResponse:
         """
         Load a notebook from a file.
@@ -215,8 +253,13 @@ def register_notebook_tools(mcp: FastMCP, notebook_state: NotebookState):
                 }
             
             # Load the notebook file
-            with open(filepath, 'r', encoding='utf-8') as f:
-                notebook_data = json.load(f)
+            with open(filepath, 'rb') as f:
+                raw_data = f.read()
+            try:
+                notebook_data = orjson.loads(raw_data)
+            except orjson.JSONDecodeError:
+                # Files written by stdlib json may contain NaN/Infinity tokens, which orjson rejects
+                notebook_data = json.loads(raw_data)
             
             # Clear current history
             notebook_state.history.clear()
@@ -233,27 +276,17 @@ def register_notebook_tools(mcp: FastMCP, notebook_state: NotebookState):
             # Load cells
             cells_loaded = 0
             for cell_data in notebook_data.get("cells", []):
-                cell_type = cell_data.get("cell_type", "")
+                load_cell = CELL_LOADERS.get(cell_data.get("cell_type", ""))
+                if load_cell is None:
+                    continue  # Skip unknown cell types
+                
                 source = cell_data.get("source", [])
                 
                 # Join source lines if it's a list
                 if isinstance(source, list):
                     source = '\n'.join(source)
                 
-                if cell_type == "markdown":
-                    cell = MarkdownCell(source=source)
-                    cell.metadata = cell_data.get("metadata", {})
-                elif cell_type == "code":
-                    cell = CodeCell(
-                        source=source,
-                        execution_count=cell_data.get("execution_count")
-                    )
-                    cell.metadata = cell_data.get("metadata", {})
-                    cell.outputs = cell_data.get("outputs", [])
-                else:
-                    continue  # Skip unknown cell types
-                
-                notebook_state.history.append(cell)
+                notebook_state.history.append(load_cell(source, cell_data))
                 cells_loaded += 1
             
             return {
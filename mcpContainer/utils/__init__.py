@@ -6,6 +6,7 @@ This package provides utility functions for notebook cell operations and debuggi
 
 from .cellUtils import run_cell
 from .cellUtils import serialize_execution_context
+from .cellUtils import invalid_index_message, invalid_insert_index_message
 from .debug import debug_tool
 
-__all__ = ['run_cell', 'serialize_execution_context', 'debug_tool']
\ No newline at end of file
+__all__ = ['run_cell', 'serialize_execution_context', 'invalid_index_message', 'invalid_insert_index_message', 'debug_tool']
\ No newline at end of file
@@ -53,4 +53,12 @@ def serialize_execution_context(context: Dict[str, any]) -> Dict[str, str]:
             except Exception:
                 # If conversion fails, use type name
                 serialized[key] = f"<{type(value).__name__}>"
-        return serialized
\ No newline at end of file
+        return serialized
+
+def invalid_index_message(total: int, name: str = "index") -> str:
+    """Describe the valid range for an index into a history of total cells"""
+    return f"Invalid {name}. History contains {total} cells (0-{total - 1})"
+
+def invalid_insert_index_message(total: int) -> str:
+    """Describe the valid range for an insert position in a history of total cells"""
+    return f"Invalid index. Must be between 0 and {total} (inclusive)"